@@ -29,6 +29,7 @@ COLORS=['b','g','r','c','m','y','k',
 
 RIT_DELTA=100
 XIT_DELTA=100
+TUNE_DEBOUNCE=250                # ms to wait after last RIT/XIT click before retuning
 
 ################################################################################
 
@@ -69,7 +70,6 @@ import pytz
 import os
 import time
 from datetime import timedelta,datetime, timezone
-from collections import OrderedDict
 
 from params import PARAMS
 from watchdog import WatchDog
@@ -95,18 +95,28 @@ class SAT_GUI(QMainWindow):
         # Init
         self.P=P
         self.now=None
+        self.bg=None
         self.sky=None
         self.rot=None
         self.Selected=None
         self.New_Sat_Selection=False
         self.flipper = False
         self.pos=[np.nan,np.nan]
+        self.rotor_pos=[np.nan,np.nan]
+        self.rotor_poll_time=0
         self.rit = 0
         self.xit = 0
+
+        # Retune once the op stops clicking the RIT/XIT buttons
+        self.retune_timer = QtCore.QTimer()
+        self.retune_timer.setSingleShot(True)
+        self.retune_timer.timeout.connect(self.RIT_XIT_Retune)
+
         self.Ready=False
         self.SettingsWin=SETTINGS_GUI_QT(P)
         self.LoggingWin=LOGGING(P)
         self.MODES=['USB','CW','FM','LSB']
+        self.MODE_IDX={m:i for i,m in enumerate(self.MODES)}
         self.ax=None
         self.event_type = None
         print('QT Version=',QtCore.qVersion())
@@ -173,6 +183,10 @@ class SAT_GUI(QMainWindow):
         # Attach mouse click to handler
         cid = self.canv.mpl_connect('button_press_event', self.MouseClick)
 
+        # Grab a copy of the background whenever the canvas is fully redrawn
+        # so the current time line can be blitted on top of it
+        cid = self.canv.mpl_connect('draw_event', self.save_background)
+
         # The second canvas is where we will plot sky track
         row=0
         self.fig2  = Figure()
@@ -440,6 +454,12 @@ class SAT_GUI(QMainWindow):
         self.txt7.setText("Hey!")
         self.grid.addWidget(self.txt7,row,col,1,3)
 
+        # The RIT & XIT panels share the same 3 icons so only look them up once
+        style    = self.style()
+        icon_up  = style.standardIcon(QStyle.StandardPixmap.SP_TitleBarShadeButton)
+        icon_dn  = style.standardIcon(QStyle.StandardPixmap.SP_TitleBarUnshadeButton)
+        icon_clr = style.standardIcon(QStyle.StandardPixmap.SP_DialogCloseButton)
+
         # Panel to implement RIT
         row=0
         col+=3
@@ -476,7 +496,7 @@ class SAT_GUI(QMainWindow):
         btn = QPushButton('')
         #btn.setIcon(self.style().standardIcon(
         #    getattr(QStyle, 'StandardPixmap.SP_TitleBarShadeButton')))
-        btn.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_TitleBarShadeButton))
+        btn.setIcon(icon_up)
         btn.setToolTip('Click to increase RIT')
         btn.clicked.connect(self.RITup)
         self.grid.addWidget(btn,row,col,1,ncols2)
@@ -485,7 +505,7 @@ class SAT_GUI(QMainWindow):
         btn = QPushButton('')
         #btn.setIcon(self.style().standardIcon(
         #    getattr(QStyle, 'SP_TitleBarUnshadeButton')))
-        btn.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_TitleBarUnshadeButton))
+        btn.setIcon(icon_dn)
         btn.setToolTip('Click to decrease RIT')
         btn.clicked.connect(self.RITdn)
         self.grid.addWidget(btn,row,col,1,ncols2)
@@ -494,7 +514,7 @@ class SAT_GUI(QMainWindow):
         btn = QPushButton('')
         #btn.setIcon(self.style().standardIcon(
         #    getattr(QStyle, 'SP_DialogCloseButton')))
-        btn.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_DialogCloseButton))
+        btn.setIcon(icon_clr)
         btn.setToolTip('Click to clear RIT')
         btn.clicked.connect(self.RITclear)
         self.grid.addWidget(btn,row,col,1,ncols2)
@@ -530,7 +550,7 @@ class SAT_GUI(QMainWindow):
         btn = QPushButton('')
         #btn.setIcon(self.style().standardIcon(
         #    getattr(QStyle, 'SP_TitleBarShadeButton')))
-        btn.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_TitleBarShadeButton))
+        btn.setIcon(icon_up)
         btn.setToolTip('Click to increase XIT')
         btn.clicked.connect(self.XITup)
         self.grid.addWidget(btn,row,col,1,ncols2)
@@ -539,7 +559,7 @@ class SAT_GUI(QMainWindow):
         btn = QPushButton('')
         #btn.setIcon(self.style().standardIcon(
         #    getattr(QStyle, 'SP_TitleBarUnshadeButton')))
-        btn.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_TitleBarUnshadeButton))
+        btn.setIcon(icon_dn)
         btn.setToolTip('Click to decrease XIT')
         btn.clicked.connect(self.XITdn)
         self.grid.addWidget(btn,row,col,1,ncols2)
@@ -548,7 +568,7 @@ class SAT_GUI(QMainWindow):
         btn = QPushButton('')
         #btn.setIcon(self.style().standardIcon(
         #    getattr(QStyle, 'SP_DialogCloseButton')))
-        btn.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_DialogCloseButton))
+        btn.setIcon(icon_clr)
         btn.setToolTip('Click to clear XIT')
         btn.clicked.connect(self.XITclear)
         self.grid.addWidget(btn,row,col,1,ncols2)
@@ -641,7 +661,7 @@ class SAT_GUI(QMainWindow):
         self.txt15.setText(mode)
         self.status_bar.setText('Set rig mode to '+mode)
         if self.mode_cb:
-            idx = self.MODES.index( mode )
+            idx = self.MODE_IDX[mode]
             self.mode_cb.setCurrentIndex(idx)
 
         if mode=='CW':
@@ -680,7 +700,7 @@ class SAT_GUI(QMainWindow):
                   '\tmde=',mode)
             print('transp=',P.transp)
 
-            idx = gui.MODES.index( mode )
+            idx = gui.MODE_IDX[mode]
             gui.mode_cb.setCurrentIndex(idx)
             
         except: 
@@ -784,38 +804,44 @@ class SAT_GUI(QMainWindow):
         self.rit += RIT_DELTA
         print('\nRITup:',self.rit)
         self.txt11.setText(str(self.rit))
-        #self.P.ctrl.track_freqs(True,tag='RIT-UP')
+        self.retune_timer.start(TUNE_DEBOUNCE)
         
     def RITdn(self):
         self.rit -= RIT_DELTA
         print('\nRITdn:',self.rit)
         self.txt11.setText(str(self.rit))
-        #self.P.ctrl.track_freqs(True,tag='RIT-DN')
+        self.retune_timer.start(TUNE_DEBOUNCE)
         
     def RITclear(self):
         print('\nRITclear:')
         self.rit = 0
         self.txt11.setText(str(self.rit))
-        #self.P.ctrl.track_freqs(True,tag='RIT-CLR')
+        self.retune_timer.start(TUNE_DEBOUNCE)
         
     # Function to increase XIT
     def XITup(self):
         self.xit += XIT_DELTA
         print('\nXITup:',self.xit)
         self.txt13.setText(str(self.xit))
-        #self.P.ctrl.track_freqs(True,tag='XIT-UP')
+        self.retune_timer.start(TUNE_DEBOUNCE)
         
     def XITdn(self):
         self.xit -= XIT_DELTA
         print('\nXITdn:',self.xit)
         self.txt13.setText(str(self.xit))
-        #self.P.ctrl.track_freqs(True,tag='XIT-DN')
+        self.retune_timer.start(TUNE_DEBOUNCE)
         
     def XITclear(self):
         print('\nXITclear:')
         self.xit = 0
         self.txt13.setText(str(self.xit))
-        #self.P.ctrl.track_freqs(True,tag='XIT-CLR')
+        self.retune_timer.start(TUNE_DEBOUNCE)
+
+    # Function to apply new RIT/XIT to the rig after a burst of clicks
+    def RIT_XIT_Retune(self):
+        ctrl=self.P.ctrl
+        if self.rig_engaged and ctrl.fdown!=None:
+            ctrl.track_freqs(tag='RIT/XIT')
         
 ################################################################################
         
@@ -881,9 +907,9 @@ class SAT_GUI(QMainWindow):
         self.cal.setMaximumDate(self.end_date)
         
         # Loop over list of sats
-        self.Satellites = OrderedDict()
+        self.Satellites = {}
         if self.P.GRID2:
-            self.Satellites2 = OrderedDict()
+            self.Satellites2 = {}
         self.pass_times=[]
         for isat in range(1,len(self.P.SATELLITE_LIST) ):
             name=self.P.SATELLITE_LIST[isat]
@@ -903,7 +929,7 @@ class SAT_GUI(QMainWindow):
 
         # Loop over list of sats
         self.pass_times=[]
-        for name in list(self.Satellites.keys()):
+        for name in self.Satellites:
             print('Draw Passes - name=',name)
             Sat=self.Satellites[name]
             
@@ -958,6 +984,32 @@ class SAT_GUI(QMainWindow):
         self.canv.draw()
 
 
+    # Function to draw line showing current time - the line is created once
+    # and then just moved so we don't have to rebuild it every time
+    def draw_now_line(self,blit=False):
+        now=datetime.now()
+        #print('now=',now)
+        if self.now:
+            self.now.set_xdata([now,now])
+        else:
+            self.now=self.ax.axvline(now,linestyle='--',color='b',animated=True)
+
+        # Nothing else has changed so just repaint the line on top of the saved background
+        if blit:
+            if self.bg==None:
+                self.canv.draw()
+            else:
+                self.canv.restore_region(self.bg)
+                self.ax.draw_artist(self.now)
+                self.canv.blit(self.fig.bbox)
+
+    # Callback after a full redraw of the pass canvas - the now line is animated
+    # so it isn't part of the background & we need to draw it ourselves
+    def save_background(self,event):
+        self.bg = self.canv.copy_from_bbox(self.fig.bbox)
+        if self.now:
+            self.ax.draw_artist(self.now)
+
     # Function to draw spots on the map
     def UpdateMap(self):
         #print('UpdateMap...')
@@ -965,13 +1017,7 @@ class SAT_GUI(QMainWindow):
             return
 
         # Draw line showing current time
-        if self.now:
-            self.now.remove()
-        now=datetime.now()
-        #print('now=',now)
-        tt=[now,now]
-        yy=self.ax.get_ylim()
-        self.now,=self.ax.plot(tt,yy,'b--')
+        self.draw_now_line()
                 
         t = self.StartTime_cb.currentText().split(':')
         t1 = int( t[0] )
@@ -996,25 +1042,24 @@ class SAT_GUI(QMainWindow):
     # Function to find next transit at current time
     def find_next_transit(self,sat_names=None):
         
-        # Loop over list of sats
+        # Loop over list of sats - all are compared at the same instant
+        best=None
         tnext=1e38
+        now = time.time()
+        print('FIND NEXT TRANSIT: now=',now)
         if sat_names[0]==None:
-            sat_names=list(self.Satellites.keys())
+            sat_names=self.Satellites
         for name in sat_names:
             Sat=self.Satellites[name]
             if name=='Moon' or not Sat.main:
                 print('FIND NEXT TRANSIT: Hmmmm - no transponder for this sat - skipping')
                 continue
             
-            # Observe sat at current time
-            now = time.mktime( datetime.now().timetuple() )
-            print('FIND NEXT TRANSIT:',name,'\t',now)
-
             # Look at next transit for this sat
             try:
                 if USE_PYPREDICT:
                     
-                    p = predict.transits(Sat.tle, self.P.my_qth, ending_after=now)
+                    p = predict.transits(Sat.tle_lines, self.P.my_qth, ending_after=now)
                     transit = next(p)
 
                     # Debug
@@ -1054,6 +1099,10 @@ class SAT_GUI(QMainWindow):
                 error_trap('GUI->FIND NEXT TRANSIT: Failure for sat '+name)
                 
         print(name,tnext)
+        if best==None:
+            # E.g. the Moon or a sat without a transponder
+            print('\nNext transit: None found\n')
+            return [None,None]
         ttt = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(tnext))
         print('\nNext transit:',best,ttt,'\n')
         return [best,tnext]
@@ -1168,24 +1217,22 @@ class SAT_GUI(QMainWindow):
                 
             if USE_PYPREDICT:
                 
-                # Assemble data for sky track
-                t=self.transit.start
-                tt=[]
-                az=[]
-                el=[]
-                lats=[]
-                lons=[]
-                footprints=[]
-                while t<self.transit.end:
-                    obs=predict.observe(tle, self.P.my_qth,at=t)
+                # Assemble data for sky track - sample every 10 sec
+                tt=np.arange(self.transit.start,self.transit.end,10.)
+                az=np.empty_like(tt)
+                el=np.empty_like(tt)
+                lats=np.empty_like(tt)
+                lons=np.empty_like(tt)
+                footprints=np.empty_like(tt)
+                my_qth=self.P.my_qth
+                for i,t in enumerate(tt):
+                    obs=predict.observe(Sat.tle_lines, my_qth,at=t)
                     #print('obs=',obs)
-                    tt.append(t)
-                    az.append(obs['azimuth'])
-                    el.append(obs['elevation'])
-                    lats.append(obs['latitude'])
-                    lons.append(obs['longitude'])
-                    footprints.append(obs['footprint'])
-                    t+=10
+                    az[i]=obs['azimuth']
+                    el[i]=obs['elevation']
+                    lats[i]=obs['latitude']
+                    lons[i]=obs['longitude']
+                    footprints[i]=obs['footprint']
 
                 # Debug
                 if False:
@@ -1243,9 +1290,8 @@ class SAT_GUI(QMainWindow):
         # Convert data to polar format & plot it
         # Note that track_az & track_el might have been modified so we go back to
         # the orig data for plotting purposes.
-        RADIANS=np.pi/180.
-        az=(90.-np.array(az))*RADIANS
-        r=90.-np.array(el)
+        az=(90.-np.asarray(az))*DEG2RAD
+        r=90.-np.asarray(el)
     
         self.ax2.clear()
         self.ax2.plot(az, r)
@@ -1272,7 +1318,7 @@ class SAT_GUI(QMainWindow):
         self.ax2.set_yticks([30, 60, 90])          # Less radial ticks
         self.ax2.set_yticklabels(3*[''])          # Less radial ticks
         
-        self.canv2.draw()
+        self.canv2.draw_idle()
 
 
     # Function to convert rotor position to actual pointing position in the sky
@@ -1297,12 +1343,11 @@ class SAT_GUI(QMainWindow):
     
     # Plot sat and rotor position
     def plot_position(self,az=np.nan,el=np.nan,pos=[np.nan,np.nan]):
-        RADIANS=np.pi/180.
         #print('\nPLOT_POSITION: az,el=',az,el,'\tflipper=',self.flipper)
 
         P=self.P
         if P.sock2.active:
-            pos=P.sock2.get_position()
+            pos=get_rotor_position(self)
         else:
             pos=[np.nan,np.nan]
         #print('PLOT_POSITION: az,el=',az,el,'\tpos=',pos)
@@ -1311,10 +1356,10 @@ class SAT_GUI(QMainWindow):
         # Plot current rotor position (the big magenta blob)
         if not np.isnan(pos[0]):
             az90,el90 = self.resolve_pointing(pos[0],pos[1])
-            self.rot.set_data( [az90*RADIANS], [el90])
+            self.rot.set_data( [az90*DEG2RAD], [el90])
 
         # Plot sat position (the black star)
-        self.sky.set_data( [(90.-az)*RADIANS], [90.-max(0.,el)] )
+        self.sky.set_data( [(90.-az)*DEG2RAD], [90.-max(0.,el)] )
 
         # Plot Sun position also
         [sun_az,sun_el,lat,lon] = self.Satellites['Moon'].current_sun_position()
@@ -1323,9 +1368,9 @@ class SAT_GUI(QMainWindow):
             sun_az=np.nan
             sun_el=np.nan
         #print('SUN:',sun_az,sun_el)
-        self.sun.set_data( [(90.-sun_az)*RADIANS], [90.-max(0.,sun_el)] )
+        self.sun.set_data( [(90.-sun_az)*DEG2RAD], [90.-max(0.,sun_el)] )
         
-        self.canv2.draw()
+        self.canv2.draw_idle()
         return
     
     
@@ -1350,14 +1395,17 @@ class SAT_GUI(QMainWindow):
         xx = self.ax.get_xlim()
         # print('xx=',xx)
         t = self.date1 + timedelta(days=event.xdata - int(xx[0]) )
-        tt = time.mktime(t.timetuple())
+        tt = t.timestamp()
         print('\ttime=',t,tt)
 
-        # Find closest pass to this time
+        # Find closest pass to this time - passes are in time order so
+        # bisect and then just check the two neighbors
         pass_times = self.pass_times[isat-1]
         #print pass_times
-        dt = abs( pass_times - tt )
-        idx = np.argmin(dt)
+        i  = np.searchsorted(pass_times,tt)
+        lo = max(i-1,0)
+        dt = abs( pass_times[lo:i+1] - tt )
+        idx = lo + int( np.argmin(dt) )
         ttt = pass_times[idx]
         # print('idx=',idx,'\tttt=',ttt)
 
@@ -23,12 +23,17 @@
 import os
 from rig_io.ft_tables import SATELLITE_LIST,CONNECTIONS,SAT_RIGS
 import argparse
-from settings import read_settings
 import datetime
 import platform
 
 ################################################################################
 
+# Allowable connection types for the rig & rotor
+RIG_CHOICES   = tuple(CONNECTIONS) + ('NONE',) + tuple(SAT_RIGS)
+ROTOR_CHOICES = ('HAMLIB','DIRECT','NONE')
+
+################################################################################
+
 # Structure to contain processing params
 class PARAMS:
     def __init__(self):
@@ -42,12 +47,12 @@ class PARAMS:
                               type=str,default=None)
         arg_proc.add_argument("-rig", help="Connection Type",
                               type=str,default=["NONE"],nargs='+',
-                              choices=CONNECTIONS+['NONE']+SAT_RIGS)
+                              choices=RIG_CHOICES)
         arg_proc.add_argument("-port", help="Connection Port",
                               type=int,default=0)
         arg_proc.add_argument("-rotor", help="Rotor connection Type",
                               type=str,default="NONE",
-                              choices=['HAMLIB','DIRECT','NONE'])
+                              choices=ROTOR_CHOICES)
         arg_proc.add_argument("-port2", help="Rotor connection Port",
                               type=int,default=0)
         arg_proc.add_argument("-sat", help="Sat to Track",
@@ -113,7 +118,9 @@ class PARAMS:
         self.NO_FLIPPER       = False
         self.PLATFORM=platform.system()
         
-        # Read config file
+        # Read config file - the settings lib is only needed once we get past
+        # the arg parser so -h doesn't pay for importing it
+        from settings import read_settings
         ATTR=['Call','Grid','Alt_ft']
         self.SETTINGS,self.RCFILE = read_settings('.satrc',attr=ATTR)
         """
@@ -131,7 +138,7 @@ class PARAMS:
         if self.MY_GRID==None:
             try:
                 self.MY_GRID = self.SETTINGS['MY_GRID']
-            except:
+            except (KeyError,TypeError):
                 self.MY_GRID = 'DM12'
                 
         try:
@@ -141,6 +148,15 @@ class PARAMS:
             # that requires the first "sat" in the list be 'None'
             if 'None' not in self.SATELLITE_LIST:
                 self.SATELLITE_LIST = ['None'] + self.SATELLITE_LIST
-        except:
+        except (KeyError,TypeError):
             self.SATELLITE_LIST = SATELLITE_LIST
 
+        # Make sure we know about the sat to track - match against the active
+        # list without regard to case, e.g. -sat ao-91
+        if self.sat_name:
+            SATS = {sat.upper():sat for sat in self.SATELLITE_LIST[1:]}
+            if self.sat_name not in SATS:
+                arg_proc.error('Unknown satellite '+args.sat+
+                               ' - should be one of '+', '.join(self.SATELLITE_LIST[1:]))
+            self.sat_name = SATS[self.sat_name]
+
@@ -73,15 +73,20 @@ except ImportError:
     from PyQt5.QtWidgets import QApplication
     from PyQt5 import QtCore
 import urllib.request, urllib.error, urllib.parse
-import json
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 from dateutil import tz
 from utilities import get_Host_Name_IP,error_trap
 
 import rig_io.socket_io as socket_io
 import os
+import shutil
+import threading
 import time
 from datetime import timedelta,datetime
-from collections import OrderedDict
+from email.utils import formatdate
 
 from params import PARAMS
 from watchdog import WatchDog
@@ -121,6 +126,169 @@ if P.host_ip=='127.0.0.1':
 else:
     P.INTERNET=True
 
+# Function to fetch data from satnogs
+def get_satnogs_json(url,outfile):
+    print('GET SATNOSG: Fetching',outfile,'...')
+    try:
+        response = urllib.request.urlopen(url)
+    except:
+        error_trap('GET SATNOGS JSON: Unable to fetch satnogs data ---')
+        return None
+    txt = response.read().decode("utf-8")
+    
+    print('txt=',txt)
+    print(type(txt),len(txt))
+
+    fp=open(outfile,'w', encoding="utf-8")
+    fp.write(txt)
+    fp.close()
+
+    obj=json_loads(txt)
+    #print('obj=',obj)
+    #for key in obj:
+    #    print(key)
+
+    return obj
+
+# Function to grab all of the available satnogs info
+def get_satnogs_info():
+    
+    # This is the root of where all the sat info is stored
+    URL3="https://db.satnogs.org/api/"
+    root=get_satnogs_json(URL3,'api.json')
+    print('root=',root)
+    print(root.keys())
+    
+    # This is the transponder data, i.e. transmitters.json
+    for item in root.keys():
+        URL4=URL3+item+'/'
+        get_satnogs_json(URL4,item+'.json')
+
+
+# Function to download the latest TLE data - the server only sends it if
+# it's newer than our local copy
+def download_tle(url,fname):
+    req = urllib.request.Request(url)
+    if os.path.isfile(fname):
+        req.add_header('If-Modified-Since',
+                       formatdate(os.path.getmtime(fname),usegmt=True))
+    try:
+        with urllib.request.urlopen(req) as response:
+            with open(fname+'.tmp','wb') as fp:
+                shutil.copyfileobj(response,fp)
+        os.replace(fname+'.tmp',fname)
+    except urllib.error.HTTPError as e:
+        if e.code!=304:
+            raise
+        # Not modified - touch local copy so we don't check again for a while
+        print('DOWNLOAD TLE: Local copy is up to date')
+        os.utime(fname)
+
+# Function to parse tle data
+def parse_tle_data():
+    item='tle'
+    item='satellites'
+    with open(item+'.json','rb') as fp:
+        objs = json_loads(fp.read())
+    print(type(objs),len(objs))
+    #print('objs=',objs)
+
+    for obj in objs:
+        id=obj['norad_cat_id']
+        if id in [25544,7530] or False:
+            print(obj)
+    
+# Function to parse transmitter data
+def parse_trsp_data():
+    item='transmitters'
+    with open(item+'.json','rb') as fp:
+        objs = json_loads(fp.read())
+    print('PARSE TRSP DATA:',type(objs),len(objs))
+    #print('objs=',objs)
+
+    path='trsp'
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+    ids=[]
+    for obj in objs:
+        id=obj['norad_cat_id']
+        if id in [25544,7530] or True:
+            if id not in ids:
+                attr='w'
+                ids.append(id)
+            else:
+                attr='a'
+            fp=open(path+'/'+str(id)+'.trsp',attr)
+            #print(obj)
+            #print('\n['+obj['description']+']')
+            fp.write('\n['+obj['description']+']\n')
+            for item in ['uplink_low','uplink_high','downlink_low','downlink_high','mode','invert','baud']:
+                val=obj[item]
+                if type(val)==float:
+                    val=int(val)
+                if val:
+                    tag=item.upper().replace('LINK','')
+                    #print(tag+'='+str(val),type(val)==float)
+                    fp.write(tag+'='+str(val)+'\n')
+            fp.close()
+
+    #print('PARSE TRSP DATA')
+    #sys.exit(0)
+
+# Function to update SatNogs, transponder & TLE data - this runs in the background
+# so no gui calls in here.  Any error is saved so the main thread can raise it.
+def update_sat_data(fname):
+    update_sat_data.error=None
+    try:
+        print('... Updating SatNogs data from Internet ...')
+        get_satnogs_info()
+    
+        print('... Updating Transponder data  ...')
+        parse_trsp_data()
+    
+        print('... Updating TLE data from Internet ...')
+        download_tle(URL1,fname)
+    except Exception as e:
+        update_sat_data.error=e
+
+# See if the TLE data needs updating
+if True:
+    # Get timestamp of nasa.txt
+    if P.PLATFORM=='Windows': 
+        URL2=os.getcwd()+'/nasa.txt'                # Override for now
+    fname=os.path.expanduser(URL2)
+    print('URL2=',fname)
+    if not os.path.isfile(fname):
+        print('nasa.txt not found - Need to update TLE data')
+        P.UPDATE_TLE = True
+    else:
+        ti_c = os.path.getctime(fname)
+        ti_m = os.path.getmtime(fname)
+ 
+        # Converting the time in seconds to a timestamp
+        c_ti = time.ctime(ti_c)
+        m_ti = time.ctime(ti_m)
+        print(f"{fname}\n was created at {c_ti} and last modified at {m_ti}")
+
+        now = time.time()
+        age=(now-ti_m)/(3600.)
+        print(f'age= {age} hours')
+
+        if age>24:
+            print('Need to update TLE data')
+            P.UPDATE_TLE = True
+    
+    #sys.exit(0)
+
+# If so, start the update now so the downloads overlap with setting up the rig, rotor, etc.
+tle_update = None
+if P.UPDATE_TLE and P.INTERNET:
+    P.gui.status_bar.setText('Retrieving SatNogs Data ...')
+    # Daemon thread so an early exit below doesn't have to wait for the downloads
+    tle_update = threading.Thread(target=update_sat_data,args=(fname,),daemon=True)
+    tle_update.start()
+
 # Open connection to rig
 P.gui.status_bar.setText('Opening connection to rig ...')
 P.sock = socket_io.open_rig_connection(P.connection,0,P.PORT,0,'SATELLITES',rig=P.rig)
@@ -269,98 +437,6 @@ if P.GRID2:
 
 ################################################################################
 
-# Function to fetch data from satnogs
-def get_satnogs_json(url,outfile):
-    print('GET SATNOSG: Fetching',outfile,'...')
-    try:
-        response = urllib.request.urlopen(url)
-    except:
-        error_trap('GET SATNOGS JSON: Unable to fetch satnogs data ---')
-        return None
-    txt = response.read().decode("utf-8")
-    
-    print('txt=',txt)
-    print(type(txt),len(txt))
-
-    fp=open(outfile,'w', encoding="utf-8")
-    fp.write(txt)
-    fp.close()
-
-    obj=json.loads(txt)
-    #print('obj=',obj)
-    #for key in obj:
-    #    print(key)
-
-    return obj
-
-# Function to grab all of the available satnogs info
-def get_satnogs_info():
-    
-    # This is the root of where all the sat info is stored
-    URL3="https://db.satnogs.org/api/"
-    root=get_satnogs_json(URL3,'api.json')
-    print('root=',root)
-    print(root.keys())
-    
-    # This is the transponder data, i.e. transmitters.json
-    for item in root.keys():
-        URL4=URL3+item+'/'
-        get_satnogs_json(URL4,item+'.json')
-
-
-# Function to parse tle data
-def parse_tle_data():
-    item='tle'
-    item='satellites'
-    with open(item+'.json') as fp:
-        objs = json.load(fp)
-    print(type(objs),len(objs))
-    #print('objs=',objs)
-
-    for obj in objs:
-        id=obj['norad_cat_id']
-        if id in [25544,7530] or False:
-            print(obj)
-    
-# Function to parse transmitter data
-def parse_trsp_data():
-    item='transmitters'
-    with open(item+'.json') as fp:
-        objs = json.load(fp)
-    print('PARSE TRSP DATA:',type(objs),len(objs))
-    #print('objs=',objs)
-
-    path='trsp'
-    if not os.path.exists(path):
-        os.makedirs(path)
-
-    ids=[]
-    for obj in objs:
-        id=obj['norad_cat_id']
-        if id in [25544,7530] or True:
-            if id not in ids:
-                attr='w'
-                ids.append(id)
-            else:
-                attr='a'
-            fp=open(path+'/'+str(id)+'.trsp',attr)
-            #print(obj)
-            #print('\n['+obj['description']+']')
-            fp.write('\n['+obj['description']+']\n')
-            for item in ['uplink_low','uplink_high','downlink_low','downlink_high','mode','invert','baud']:
-                val=obj[item]
-                if type(val)==float:
-                    val=int(val)
-                if val:
-                    tag=item.upper().replace('LINK','')
-                    #print(tag+'='+str(val),type(val)==float)
-                    fp.write(tag+'='+str(val)+'\n')
-            fp.close()
-
-    #print('PARSE TRSP DATA')
-    #sys.exit(0)
-    
-    
 # Get TLE data
 print('Getting TLE data ...')
 P.gui.status_bar.setText('Reading TLE data ...')
@@ -369,72 +445,23 @@ if False:
     parse_tle_data()
     sys.exit(0)
 
-if True:
-    # Get timestamp of nasa.txt
-    if P.PLATFORM=='Windows': 
-        URL2=os.getcwd()+'/nasa.txt'                # Override for now
-    fname=os.path.expanduser(URL2)
-    print('URL2=',fname)
-    if not os.path.isfile(fname):
-        print('nasa.txt not found - Need to update TLE data')
-        P.UPDATE_TLE = True
-    else:
-        ti_c = os.path.getctime(fname)
-        ti_m = os.path.getmtime(fname)
- 
-        # Converting the time in seconds to a timestamp
-        c_ti = time.ctime(ti_c)
-        m_ti = time.ctime(ti_m)
-        print(f"{fname}\n was created at {c_ti} and last modified at {m_ti}")
-
-        now = time.time()
-        age=(now-ti_m)/(3600.)
-        print(f'age= {age} hours')
+# Wait for the SatNogs/TLE update started above to finish
+if tle_update:
+    P.gui.status_bar.setText('Waiting for SatNogs & TLE data ...')
+    tle_update.join()
+    if update_sat_data.error:
+        raise update_sat_data.error
 
-        if age>24:
-            print('Need to update TLE data')
-            P.UPDATE_TLE = True
-    
-    #sys.exit(0)
-
-if P.UPDATE_TLE and P.INTERNET:
-    print('... Updating SatNogs data from Internet ...')
-    P.gui.status_bar.setText('Retrieving SatNogs Data ...')
-    get_satnogs_info()
-    
-    print('... Updating Transponder data  ...')
-    parse_trsp_data()
-    
-    print('... Updating TLE data from Internet ...')
-    if sys.version_info[0]==3:
-        response = urllib.request.urlopen(URL1)
-    else:
-        response = urllib2.urlopen(URL1)
-    html = response.read().decode("utf-8") 
-    #print(html)
-    #print( len(html) )
-    
-    fname=os.path.expanduser(URL2)
-    fp=open(fname,'w')
-    fp.write(html)
-    fp.close()
-    #sys.exit(0)
-else:
-    if P.PLATFORM=='Windows':
-        url2="file:\\" + os.path.expanduser(URL2)
-    else:
-        url2="file://" + os.path.expanduser(URL2)
-    print('url=',url2)
-    if sys.version_info[0]==3:
-        response = urllib.request.urlopen(url2)
-    else:
-        response = urllib2.urlopen(url2)
-    html = response.read().decode("utf-8") 
+# Read the local copy - in one shot rather than going thru urllib
+try:
+    with open(fname,'rb') as fp:
+        html = fp.read().decode("utf-8")
+except FileNotFoundError:
+    print('TLE data file',fname,'not found!')
+    sys.exit(0)
 #print( html)
 #print( type(html))
-if P.PLATFORM=='Windows':
-    html=html.replace('\r','')
-P.TLE=html.replace('\n\n','\n').split('\n')
+P.TLE=[line for line in html.splitlines() if line]
 #print('TLE=',P.TLE)
 #sys.exit(0)
 print(" ")
@@ -37,6 +37,31 @@ from utilities import freq2band, error_trap
 
 ################################################################################
 
+DEBUG=False             # Set to see diagnostics from the once-a-sec tracking loop
+
+################################################################################
+
+# Print only if we're debugging - keeps tty I/O out of the tracking loop
+def dprint(*args,**kwargs):
+    if DEBUG:
+        print(*args,**kwargs)
+
+# Only touch a label if its text has actually changed - saves Qt from
+# re-laying out the status labels every tick
+def set_text(lbl,txt):
+    if lbl.text()!=txt:
+        lbl.setText(txt)
+
+# Mode to use on the uplink VFO for an inverting transponder
+INVERT_MODE = {'FM':'FM', 'USB':'LSB', 'LSB':'USB', 'CW':'CW-R', 'CW-R':'CW'}
+
+# Formats for status labels txt1-txt7 that are updated by track_freqs
+LABEL_FMTS = ( "{:,}".format, "{:,}".format, "{:,}".format, "{:,}".format,
+               "Az: {: 3d}".format, "El: {: 3d}".format,
+               lambda flipper: 'Flip-a-roo-ski!' if flipper else 'Not flipped' )
+
+################################################################################
+
 # Rig control called every sec seconds
 class RigControl:
     def __init__(self,P,sec):
@@ -51,6 +76,10 @@ class RigControl:
         self.fdown = None
         self.fdop1 = None
         self.fdop2 = None
+        self.fdn_ref = None
+        self.fup_ref = None
+        self.sign    = 1
+        self.last_vals = (None,)*len(LABEL_FMTS)
         self.az    = None
         self.el    = None
         self.sat_map_cntr=0
@@ -59,7 +88,7 @@ class RigControl:
             tmpfile="satellites.log"
         else:
             tmpfile="/tmp/satellites.log"
-        self.fp_log = open(tmpfile, "w")
+        self.fp_log = open(tmpfile, "w", buffering=1)      # Line buffered
         
         row=['Time Stamp','Source','Selected',
              'Inverting','dn1','dn2','up1','up2','Mode',
@@ -67,12 +96,14 @@ class RigControl:
              'frqA','frqB','RIT','XIT',
              'az','el','pos[0]','pos[1]','new_pos[0]','new_pos[1]','daz','de',
              'flipper','rig_engaged','rotor_engaged','rotor_updated']
-        for item in row:
-            self.fp_log.write(str(item)+',')
-        self.fp_log.write('\n')
-        self.fp_log.flush()
+        self.write_log(row)
 
 
+    # Write a row to the log file in one go - the file is line buffered so
+    # each row still makes it to disk right away
+    def write_log(self,row):
+        self.fp_log.write( ','.join(map(str,row))+',\n' )
+
     def Updater(self):
         P=self.P
         gui=P.gui
@@ -87,6 +118,7 @@ class RigControl:
                 P.satellite = gui.Satellites[gui.Selected]
                 if P.satellite.main:
                     P.transp    = P.satellite.transponders[P.satellite.main]
+                    self.set_transp_refs(P.transp)
                     print('main=',P.satellite.main)
                     print('transp=',P.transp)
                 else:
@@ -124,7 +156,7 @@ class RigControl:
                     self.set_rig_mode( mode )
                     gui.txt15.setText(mode)
                     if gui.mode_cb:
-                        idx = gui.MODES.index( mode )
+                        idx = gui.MODE_IDX[mode]
                         gui.mode_cb.setCurrentIndex(idx)
                 else:
                     gui.ModeSelect()
@@ -180,6 +212,17 @@ class RigControl:
         # Update AOS/LOS indicator
         self.update_aos_los()
 
+    # Routine to set reference freqs for tracking - these only change when
+    # we select a new sat so no need to look them up every tick
+    def set_transp_refs(self,transp):
+        self.fdn_ref = transp['fdn1']
+        if transp['Inverting']:
+            self.fup_ref = transp['fup2']
+            self.sign    = -1
+        else:
+            self.fup_ref = transp['fup1']
+            self.sign    = 1
+            
     # Routine to check VFO bands - the IC9700 is quirky if the bands are reversed
     def check_ic9700_bands(self,P):
         frq1 = int( P.sock.get_freq(VFO=self.vfos[0]) )
@@ -208,16 +251,9 @@ class RigControl:
         P.sock.set_mode(mode,VFO=self.vfos[0],Filter=filter)
         if len(self.vfos)>1:
             if P.transp['Inverting']:
-                if mode=='FM':
-                    P.sock.set_mode('FM',VFO=self.vfos[1])
-                elif mode=='USB':
-                    P.sock.set_mode('LSB',VFO=self.vfos[1])
-                elif mode=='LSB':
-                    P.sock.set_mode('USB',VFO=self.vfos[1])
-                elif mode=='CW':
-                    P.sock.set_mode('CW-R',VFO=self.vfos[1],Filter=filter)
-                elif mode=='CW-R':
-                    P.sock.set_mode('CW',VFO=self.vfos[1],Filter=filter)
+                mode2=INVERT_MODE.get(mode)
+                if mode2:
+                    P.sock.set_mode(mode2,VFO=self.vfos[1],Filter=filter)
             else:
                 P.sock.set_mode(mode,VFO=self.vfos[1],Filter=filter)
 
@@ -229,13 +265,9 @@ class RigControl:
         #print('\nTRACK_FREQS: P.transp=',P.transp)
         
         # Compute uplink freq corresponding to downlink
-        df = self.fdown - P.transp['fdn1']
-        if P.transp['Inverting']:
-            self.fup = P.transp['fup2'] - df
-            #print('Inv:',P.transp['fup2'],df,self.fup)
-        else:
-            self.fup = P.transp['fup1'] + df
-            #print('Non:',P.transp['fup1'],df,self.fup)
+        df = self.fdown - self.fdn_ref
+        self.fup = self.fup_ref + self.sign*df
+        #print('Up:',self.fup_ref,self.sign,df,self.fup)
             
         # Compute Doppler shifts for up and down links
         [self.fdop1,self.fdop2,self.az,self.el,rng,lat,lon,footprint] = \
@@ -250,7 +282,7 @@ class RigControl:
         # Compute downlink freq at rig = frq at sat + Doppler
         self.frqA = int(self.fdown+self.fdop1 + gui.rit)
         if gui.rig_engaged or Force:
-            print('TRACK FREQS: VFO A=',self.frqA,'\tVFO B=',self.frqB)
+            dprint('TRACK FREQS: VFO A=',self.frqA,'\tVFO B=',self.frqB)
             P.sock.set_freq(1e-3*self.frqA,VFO=self.vfos[0])
             if P.USE_SDR:
                 #print('Setting SDR freq to:',1e-3*self.frqA)
@@ -273,7 +305,7 @@ class RigControl:
             self.sat_map_cntr+=1
             if self.sat_map_cntr>=10:
                 name = P.satellite.name
-                print('\n^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^ Updating footprint ...',name)
+                dprint('\n^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^ Updating footprint ...',name)
                 self.sat_map_cntr=0
                 gui.MapWin.DrawSatFootprint(name,lon,lat,footprint)
         
@@ -286,21 +318,18 @@ class RigControl:
             on_off=P.sock.recorder(False)
         #print('=== buf=',on_off)
             
-        # Update gui
-        gui.txt1.setText("{:,}".format(int(self.fdown)))
-        gui.txt2.setText("{:,}".format(int(self.fup)))
-        gui.txt3.setText("{:,}".format(int(self.frqA)))
-        gui.txt4.setText("{:,}".format(int(self.frqB)))
-
-        gui.txt5.setText("Az: {: 3d}".format(int(new_pos[0])))
-        gui.txt6.setText("El: {: 3d}".format(int(new_pos[1])))
-        if gui.flipper:
-            gui.txt7.setText('Flip-a-roo-ski!')
-        else:
-            gui.txt7.setText('Not flipped')
+        # Update gui - only reformat the labels whose values have changed
+        vals = ( int(self.fdown), int(self.fup), int(self.frqA), int(self.frqB),
+                 int(new_pos[0]), int(new_pos[1]), gui.flipper )
+        if vals!=self.last_vals:
+            lbls = (gui.txt1,gui.txt2,gui.txt3,gui.txt4,gui.txt5,gui.txt6,gui.txt7)
+            for lbl,fmt,val,last in zip(lbls,LABEL_FMTS,vals,self.last_vals):
+                if val!=last:
+                    set_text(lbl,fmt(val))
+            self.last_vals = vals
         #self.update_aos_los()
 
-        gui.SRng.setText( '%d miles' % rng )
+        set_text(gui.SRng,'%d miles' % rng)
         
         # Save log file to assist in further development
         self.save_diagnostics(tag,df,pos,new_pos,daz,de,rotor_updated)
@@ -319,22 +348,18 @@ class RigControl:
              self.frqA,self.frqB,gui.rit,gui.xit,
              self.az,self.el,pos[0],pos[1],new_pos[0],new_pos[1],daz,de,
              gui.flipper,gui.rig_engaged,gui.rotor_engaged,rotor_updated]
-        for item in row:
-            self.fp_log.write(str(item)+',')
-        self.fp_log.write('\n')
-        self.fp_log.flush()
+        self.write_log(row)
 
 
 
+    # Convert whole no. of seconds to HH:MM:SS
     def hms(self,dt):
 
-        hrs  = int( dt/3600. )
-        dt2  = dt-3600*hrs
-        mins = int( dt2/60. )
-        secs = int( dt2-60*mins )
+        hrs,dt2   = divmod(dt,3600)
+        mins,secs = divmod(dt2,60)
 
         txt = "{:02d}:{:02d}:{:02d}".format(hrs,mins,secs)
-        #print(dt,dt2,dt3,'\t',hrs,mins,secs,'\t',txt)
+        #print(dt,dt2,'\t',hrs,mins,secs,'\t',txt)
         
         return txt
         
@@ -343,7 +368,7 @@ class RigControl:
     def update_aos_los(self):
         gui=self.P.gui
         
-        now = time.mktime( datetime.now().timetuple() )
+        now = time.time()
         #print('UPDATE AOS-LOS: Now=',now,type(now),
         #      '\taos=',gui.aos,type(gui.aos),
         #      '\tlos=',gui.los,type(gui.los))
@@ -357,13 +382,13 @@ class RigControl:
             #print('UPDATE AOS-LOS: Whooops!')
         
         if daos>0:
-            gui.txt9.setText("AOS in\t"+self.hms(daos))
+            set_text(gui.txt9,"AOS in\t"+self.hms(int(daos)))
             gui.event_type = 1
         elif dlos>0:
-            gui.txt9.setText("LOS in\t"+self.hms(dlos))
+            set_text(gui.txt9,"LOS in\t"+self.hms(int(dlos)))
             gui.event_type = 0
         else:
-            gui.txt9.setText("Past Event")
+            set_text(gui.txt9,"Past Event")
             gui.event_type = -1
 
         if False:
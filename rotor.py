@@ -32,15 +32,25 @@ import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import time
-from datetime import datetime
 
 ###############################################################################
 
 THRESH=10               # Was 15
 ROTOR_THRESH = 10       # Was 2 but rotor updates too quickly
+ROTOR_DEBUG=False       # Set to see diagnostics from the once-a-sec rotor positioning
+ROTOR_POLL_INTERVAL=3   # Min. secs between rotor position queries while tracking
 
 ###############################################################################
 
+# Read rotor position - the rotor only moves a few deg/sec so there's no need
+# to query it every time thru the tracking loop
+def get_rotor_position(gui):
+    now=time.time()
+    if now-gui.rotor_poll_time>=ROTOR_POLL_INTERVAL:
+        gui.rotor_pos=gui.P.sock2.get_position()
+        gui.rotor_poll_time=now
+    return gui.rotor_pos
+
 # Function to determine if rotor is flipped
 def rotor_flipped(self):
 
@@ -66,22 +76,18 @@ def flip_a_roo(self):
 
     # Check if we're already part way into the pass and can ignore prior part of pass
     if True:
-        now = time.mktime( datetime.now().timetuple() )
+        now = time.time()
         tt = self.track_t
         t1 = tt[0]
         t2 = tt[-1]
         #print('\nFLIP_A_ROO: now=',now)
         #print('Complete track: Time,Az,El',len(tt))
-        i=0
-        ibest=None
-        for t,a,e in zip(tt,az,el):
-            if now>=t:
-                ibest=i               # Closest time so far
-            i+=1
-            #print('\t',t,'\t',a,'\t',e,'\t',ibest)
+
+        # Last point in the track at or before the current time
+        ibest = np.searchsorted(tt,now,side='right') - 1
 
         # If we're partially through the pass, ignore the prior part
-        if ibest!=None and ibest<len(tt)-1:
+        if ibest>=0 and ibest<len(tt)-1:
             az=az[ibest:]
             el=el[ibest:]
             tt=tt[ibest:]
@@ -97,11 +103,12 @@ def flip_a_roo(self):
     # Query current rotor position & use it to determine if array is flipped
     rotor_flipped(self)
 
-    # Compute quadrant each point is in
-    quad1 = np.logical_and(az>0  , az<=90)
-    quad2 = np.logical_and(az>90  , az<=180)
-    quad3 = np.logical_and(az>180 , az<=270)
-    quad4 = np.logical_and(az>270 , az<=360)
+    # Compute quadrant each point is in - (0,90] is quad 1, (90,180] is quad 2, etc.
+    quad  = np.ceil(az/90.)
+    quad1 = quad==1
+    quad2 = quad==2
+    quad3 = quad==3
+    quad4 = quad==4
 
     n1 = np.sum(quad1)
     n2 = np.sum(quad2)
@@ -111,8 +118,8 @@ def flip_a_roo(self):
     
     # First, check if the track transists into both the 2nd and 3rd quadrants
     # or into 1st and 4th quadrants
-    self.cross0   = any(quad1) and any(quad4)
-    self.cross180 = any(quad2) and any(quad3)
+    self.cross0   = quad1.any() and quad4.any()
+    self.cross180 = quad2.any() and quad3.any()
 
     # Initially assume that there is nothing to worry about
     self.quads12_only = False
@@ -242,18 +249,17 @@ def rotor_positioning(gui,az,el,Force):
 
     # Flip antenna if needed to avoid ambiquity at 180-deg
     if gui.flipper:
-        print('*** Need a Flip-a-roo-ski ***')
-        if new_pos[0]<180:
-            new_pos = [new_pos[0]+180. , 180.-new_pos[1]]
-        else:
-            new_pos = [new_pos[0]-180. , 180.-new_pos[1]]
+        if ROTOR_DEBUG:
+            print('*** Need a Flip-a-roo-ski ***')
+        # Rotate az by 180 deg (i.e. +180 below 180, -180 above) and flip el over the top
+        new_pos = [(new_pos[0]+180.) % 360. , 180.-new_pos[1]]
 
     # Update rotor 
     rotor_updated=False
     if gui.P.sock2.active:
             
         # Current rotor position
-        pos=gui.P.sock2.get_position()
+        pos=get_rotor_position(gui)
         
         # Compute pointing error & adjust rotor if the error is large enough
         daz=pos[0]-new_pos[0]
@@ -265,6 +271,7 @@ def rotor_positioning(gui,az,el,Force):
                 #print('ROTOR_POSITIONING: new pos=',new_pos)
                 gui.P.sock2.set_position(new_pos)
                 rotor_updated=True
+                gui.rotor_poll_time=0           # Re-read position next time since it's moving
                 
     else:
         pos=[np.nan,np.nan]
@@ -42,17 +42,19 @@ MIN_PEAK_EL  = 30                         # Degrees, min. elevation to identify
 USE_PYPREDICT=False
 USE_PYPREDICT=True
 SUN_UPDATE_INTERVAL = 10*60               # Only update every ten minutes
+MAX_PASSES   = 1000                       # Sanity limit on no. of passes for a single sat
+MAX_BUMPS    = 10                         # Max no. of times to skip past a bad transit
 
 ################################################################################
 
 import os
 import sys
+import re
 if sys.platform == "win32":
     USE_PYPREDICT=False
 if USE_PYPREDICT:
     import predict
 from configparser import ConfigParser 
-from collections import OrderedDict
 import time
 from datetime import timedelta,datetime, timezone
 import ephem
@@ -82,31 +84,45 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from constants import *
 from utilities import error_trap
 
+# Resolve this once rather than for every sat
+TRANSP_DIR = os.path.expanduser(TRANSP_DATA)
+
 ################################################################################
 
+# Sats that go by a different name in the TLE data
+TLE_ALIASES = {'CAS-6' : 'TO-108',
+               'AO-7'  : 'AO-07',
+               'XW-3'  : 'XW 3',
+               'FS-3'  : 'Falconsat-3'}
+
+# Transponder descriptions that identify the main transponder
+MAIN_EXACT     = frozenset(('MODE U/V (B) LIN','MODE U/V LINEAR','MODE V/U FM'))
+MAIN_SUBSTR_RE = re.compile('FM VOICE|FM TRANSCEIVER|TRANSPONDER|TRANSPODER')
+
 # Function to assemble TLE data for a particular satellite
 def get_tle(TLE,sat):
 
     if not hasattr(get_tle,"TLE_SHOWN"):
         get_tle.TLE_SHOWN=False
+
+    # Index the TLE data the first time we see it so we don't have to
+    # search thru the whole list for each sat
+    if getattr(get_tle,"TLE",None) is not TLE:
+        get_tle.TLE=TLE
+        get_tle.TLE_INDEX={}
+        for i,line in enumerate(TLE):
+            get_tle.TLE_INDEX.setdefault(line,i)
     
-    sat2=sat
-    if sat=='CAS-6':
-        sat2='TO-108'
-    elif sat=='AO-7':
-        sat2='AO-07'
-    elif sat=='XW-3':
-        sat2='XW 3'
-    elif sat=='FS-3':
-        sat2='Falconsat-3'
-    elif 'TEVEL' in sat:
+    if 'TEVEL' in sat:
         sat2='Tevel'+sat[5:]
+    else:
+        sat2=TLE_ALIASES.get(sat,sat)
     if sat!=sat2:
         print('GET_TLE: Warning - name change for ',sat,' to ',sat2)
 
     try:
-        idx  = TLE.index(sat2)
-    except: 
+        idx  = get_tle.TLE_INDEX[sat2]
+    except KeyError: 
         error_trap('GET TLE - Cant find TLE for sat='+sat)
         if not get_tle.TLE_SHOWN:
             print('TLE=',TLE)
@@ -115,9 +131,7 @@ def get_tle(TLE,sat):
             print('See previous trap msg for complete TLE')
         return None
 
-    tle = sat + '\n' \
-        + TLE[idx+1] + '\n' \
-        + TLE[idx+2] + '\n'
+    tle = '\n'.join( (sat,TLE[idx+1],TLE[idx+2],'') )
 
     if sat=='ISS':
         print('GET_TLE: sat=',sat,'\ntle=',tle)
@@ -127,6 +141,45 @@ def get_tle(TLE,sat):
 
 ################################################################################
 
+# Transponder data that has already been read, indexed by sat number
+TRSP_CACHE = {}
+
+# Function to read the transponder data for a sat - each file is only parsed once
+def read_trsp(number):
+
+    if number in TRSP_CACHE:
+        return TRSP_CACHE[number]
+
+    fname = TRANSP_DIR+'/'+str(number)+'.trsp'
+    print('fname=',fname)
+    config = ConfigParser() 
+    print('config.read=',config.read(fname)) 
+
+    trsp = {}
+    for transp in config.sections():
+        items=dict( config.items(transp) )
+        items['fdn1']=int( items['down_low'] )
+        if 'down_high' in items:
+            items['fdn2']=int( items['down_high'] )
+        else:
+            items['fdn2']=items['fdn1']
+
+        # Make sure we have all the info we'll want later on
+        if 'up_low' in items:
+            items['fup1']=int( items['up_low'] )
+        else:
+            items['fup1']=0
+        if 'up_high' in items:
+            items['fup2']=int( items['up_high'] )
+        else:
+            items['fup2']=items['fup1']
+        trsp[transp]=items
+
+    TRSP_CACHE[number]=trsp
+    return trsp
+
+################################################################################
+
 # Structure compatible with what comes out of Predict
 class TRANSIT:
     def __init__(self,info,t,az,el,lats,lons,footprints):
@@ -206,8 +259,12 @@ class SATELLITE:
             return
         tle0=self.tle.split('\n')
         self.sat = ephem.readtle(tle0[0],tle0[1],tle0[2])
+
+        # Keep the TLE split into lines so predict doesn't have to re-split
+        # it every time we observe the sat
+        self.tle_lines = tuple(tle0[:3])
         if USE_PYPREDICT:
-            self.p   = predict.transits(self.tle, qth,
+            self.p   = predict.transits(self.tle_lines, qth,
                                         ending_after=tafter, ending_before=tbefore)
 
         # Get transponder info for this sat
@@ -218,6 +275,7 @@ class SATELLITE:
         ts_old=None
         te_old=None
         npasses=0
+        nbumps=0
         while True:
 
             # Move through list of passes & break if we're done
@@ -241,7 +299,7 @@ class SATELLITE:
             te = datetime.fromtimestamp(transit.end)
             npasses+=1
             #print('Pass=',npasses,'\tts=',ts,'\tte=',te)
-            if npasses>1000:
+            if npasses>MAX_PASSES:
                 print('Too many passes!')
                 return
                 sys.exit(0)
@@ -263,17 +321,18 @@ class SATELLITE:
                 #print(transit.start,transit.end,tlast)
                 #print(ts,te,datetime.fromtimestamp(tafter),datetime.fromtimestamp(tbefore))
                 if tlast>=transit.end:
-                    #print('Unexpected result at',ts,'- giving up')
-                    #break
+                    nbumps+=1
+                    if nbumps>MAX_BUMPS:
+                        print('*** Unexpected result at',ts,'- giving up')
+                        break
                     print('*** Unexpected result at',ts,'- bumping by 1 hour ...')
-                    date99   = ts + timedelta(hours=1)
-                    print(date99)
-                    tafter2  = time.mktime(date99.timetuple())
-                    self.p   = predict.transits(self.tle, qth,
+                    tafter2  = transit.start + 3600
+                    self.p   = predict.transits(self.tle_lines, qth,
                                                 ending_after=tafter2, ending_before=tbefore)
                     continue
                 else:
                     tlast=transit.end
+                    nbumps=0            # Only count consecutive bumps
 
             elif name=='FO-29' and USE_PYPREDICT:
                 print('HEY!!')
@@ -313,41 +372,20 @@ class SATELLITE:
             # There are no transponders but we fake till we make it
             self.number=self.name
         else:
+            # Catalog no. is in cols 3-7 of line 1 of the TLE
             print('GET_TRANSPONDERS: tle =',self.tle)
-            tle2=self.tle.split()
-            print('GET_TRANSPONDERS: tle2=',tle2)
-            self.number=int( tle2[2][:-1] )
+            self.number=int( self.tle_lines[1][2:7] )
             print('GET_TRANSPONDERS: number=',self.number)
 
-        fname = os.path.expanduser(TRANSP_DATA+'/'+str(self.number)+'.trsp')
-        print('fname=',fname)
-        #sys.exit(0)
-
         # Read the transponder data for this sat
-        config = ConfigParser() 
-        print('config.read=',config.read(fname)) 
-        self.transponders = OrderedDict()
-        for transp in config.sections():
+        self.transponders = {}
+        for transp,items in read_trsp(self.number).items():
 
-            # Get details for this transponder
-            items=dict( config.items(transp) )
+            # Get details for this transponder - make a copy since the
+            # cached data is shared
+            items=dict(items)
             if self.name=='HO-113':
                 print('\nitems=',items)
-            items['fdn1']=int( items['down_low'] )
-            if 'down_high' in items:
-                items['fdn2']=int( items['down_high'] )
-            else:
-                items['fdn2']=items['fdn1']
-
-            # Make sure we have all the info we'll want later on
-            if 'up_low' in items:
-                items['fup1']=int( items['up_low'] )
-            else:
-                items['fup1']=0
-            if 'up_high' in items:
-                items['fup2']=int( items['up_high'] )
-            else:
-                items['fup2']=items['fup1']
 
             # Decipher info about this transponder
             transp2=transp.upper()
@@ -381,10 +419,7 @@ class SATELLITE:
             elif ('PE0SAT' in transp2) or ('L/V' in transp2) or ('U/V CW' in transp):
                 print('*** Skipping',transp)
                 flagged=''
-            elif ('FM VOICE' in transp2) or ('FM TRANSCEIVER' in transp2) or \
-                 ('MODE U/V (B) LIN' == transp2) or \
-                 ('MODE U/V LINEAR' == transp2) or ('MODE V/U FM' == transp2) or \
-                 ('TRANSPONDER' in transp2) or ('TRANSPODER' in transp2):
+            elif (transp2 in MAIN_EXACT) or MAIN_SUBSTR_RE.search(transp2):
                 if not self.main:
                     self.main=transp
                     flagged='*****'
@@ -414,17 +449,18 @@ class SATELLITE:
         # fdop = doppler100*fc/100e6
 
         # Observe sat at current time
-        now = time.mktime( datetime.now().timetuple() )
+        now = time.time()
         if self.name=='Moon':
             # Hack hack hack!
             [az,el,lat,lon,illum]   = self.current_moon_position()
             return [0,0,az,el,230e3,lat,lon,1]
         else:
             if USE_PYPREDICT:
-                obs = predict.observe(self.tle, my_qth,now)
-                obs1=self.observe(now)
-                #print('Doppler:',obs['doppler'],obs1['doppler'])
-                #sys.exit(0)
+                obs = predict.observe(self.tle_lines, my_qth,now)
+                if False:
+                    obs1=self.observe(now)
+                    print('Doppler:',obs['doppler'],obs1['doppler'])
+                    sys.exit(0)
 
             else:
                 obs=self.observe(now)
@@ -659,7 +695,7 @@ class SATELLITE:
             self.t2.append( tmid )
             self.y2.append(isat)
                 
-            self.pass_times.append( time.mktime(tmid.timetuple()) )
+            self.pass_times.append( tmid.timestamp() )
                 
         return transits
 
@@ -866,10 +902,10 @@ class MAPPING(QMainWindow):
         footprints=[]
         for m in range(0,int(npasses*rev_mins+2),1):
             dt = timedelta(minutes=m)
-            t = time.mktime( (tstart+dt).timetuple() )
+            t = (tstart+dt).timestamp()
             
             if USE_PYPREDICT:
-                obs = predict.observe(Sat.tle,self.P.my_qth,t)
+                obs = predict.observe(Sat.tle_lines,self.P.my_qth,t)
             else:
                 obs = Sat.observe(t)
                 
@@ -27,7 +27,7 @@ try:
         from PySide6 import QtCore
 except ImportError:
     from PyQt5 import QtCore
-from datetime import timedelta,datetime
+from datetime import timedelta
 
 ################################################################################
 
@@ -46,18 +46,10 @@ class WatchDog:
         gui=self.P.gui
         print('WatchDog...',gui.date1)
         
-        # Draw line showing current time
-        if gui.now:
-            gui.now.remove()
-        now=datetime.now()
-        #print('now=',now)
-        tt=[now,now]
-        yy=gui.ax.get_ylim()
-        gui.now,=gui.ax.plot(tt,yy,'b--')
+        # Draw line showing current time - only the line itself is repainted
+        gui.draw_now_line(blit=True)
 
         # Trying to maintain date selection
         #gui.cal.setSelectedDate(gui.date1)
         #gui.cal.updateCell(gui.date1)
         gui.cal.repaint()
-        
-        gui.canv.draw()